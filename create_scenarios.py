@@ -1,13 +1,30 @@
 #!/usr/bin/env python3
 
-from dataclasses import dataclass
-from string import Template
+import functools
+import hashlib
+import io
+import itertools
+import math
+import py_compile
+import re
+import tarfile
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import NamedTuple
 
 # Paths
 TEMPLATE_PATH = "examples/pbfhr/input_template.py"
 OUTPUT_ROOT = "pbfhr_runs"
 MANIFEST_PATH = "pbfhr_manifest.txt"
+MAX_WRITERS = 8
+
+# Set to e.g. "pbfhr_inputs.tar" to pack every input into one archive
+# (members "<run_dir>/input.py") instead of writing N run directories.
+# Any existing pbfhr_runs/*/input.py is then stale; launch with
+# PBFHR_ARCHIVE=<archive> so run_on_explorer.sh extracts over it.
+ARCHIVE_PATH = None
 
 # PB-FHR rated thermal power (W)
 P_NOM_TH = 236e6
@@ -25,6 +42,9 @@ POST_RAMP_S = 80.0
 # Desired power ramp rate (fraction of rated per minute)
 POWER_RAMP_RATE_PER_MIN = 0.05   # 5% / min
 
+# Every scenario ramps by 0.1 of rated, so the ramp duration is fixed
+_CONST_T_RAMP_S = (0.1 / POWER_RAMP_RATE_PER_MIN) * 60.0
+
 # Reactivity ramp rate (pcm / min) — calibrated manually
 RHO_RATE_PCM_PER_MIN = 240.0
 
@@ -32,9 +52,25 @@ RHO_RATE_PCM_PER_MIN = 240.0
 # Non-zero to avoid initial power decay
 RHO_BIAS_PCM = 200.0
 
+# Pebble radii (m)
+R_MOD   = 1.25 / 100.0
+R_FUEL  = 1.4 / 100.0
+R_SHELL = 1.5 / 100.0
+
+# Initial (t_fuel, t_mod, t_shell, t_cool) in kelvin per temperature bucket
+_K = 273.15
+_BUCKET_TEMPS_K = {
+    "low":     (750.0 + _K, 740.0 + _K, 730.0 + _K, 620.0 + _K),
+    "nominal": (800.0 + _K, 800.0 + _K, 770.0 + _K, 650.0 + _K),
+    "high":    (850.0 + _K, 840.0 + _K, 820.0 + _K, 680.0 + _K),
+}
+
+# $NAME placeholders in the template. Unlike string.Template, "$$" escapes
+# and "${NAME}" are not supported; compile_template rejects any other "$".
+_PLACEHOLDER_RE = re.compile(r"\$([A-Za-z_]\w*)")
 
-@dataclass
-class Scenario:
+
+class Scenario(NamedTuple):
     p0: float
     p1: float
     direction: str   # "up" or "down"
@@ -44,24 +80,44 @@ class Scenario:
 
 
 def initial_temps_kelvin(bucket: str):
-    if bucket == "low":
-        t_cool_C  = 620.0
-        t_fuel_C  = 750.0
-        t_mod_C   = 740.0
-        t_shell_C = 730.0
-    elif bucket == "high":
-        t_cool_C  = 680.0
-        t_fuel_C  = 850.0
-        t_mod_C   = 840.0
-        t_shell_C = 820.0
-    else:  # nominal
-        t_cool_C  = 650.0
-        t_fuel_C  = 800.0
-        t_mod_C   = 800.0
-        t_shell_C = 770.0
-
-    K = 273.15
-    return (t_fuel_C + K, t_mod_C + K, t_shell_C + K, t_cool_C + K)
+    return _BUCKET_TEMPS_K[bucket]
+
+
+def area_sphere(r: float) -> float:
+    return 4.0 * math.pi * pow(r, 2)
+
+
+def vol_sphere(r: float) -> float:
+    return (4.0 / 3.0) * math.pi * pow(r, 3)
+
+
+def pebble_geometry():
+    """Plain-float pebble volumes (m^3) and outer area (m^2), so the
+    generated input attaches units once instead of doing Pint arithmetic."""
+    vol_mod = vol_sphere(R_MOD)
+    vol_fuel = vol_sphere(R_FUEL) - vol_sphere(R_MOD)
+    vol_shell = vol_sphere(R_SHELL) - vol_sphere(R_FUEL)
+    vol_cool = (vol_mod + vol_fuel + vol_shell) * 0.4 / 0.6
+    a_pb = area_sphere(R_SHELL)
+    return vol_mod, vol_fuel, vol_shell, vol_cool, a_pb
+
+
+def _geometry_values():
+    vol_mod, vol_fuel, vol_shell, vol_cool, a_pb = pebble_geometry()
+    return {
+        "R_MOD": repr(R_MOD),
+        "R_FUEL": repr(R_FUEL),
+        "R_SHELL": repr(R_SHELL),
+        "VOL_MOD": repr(vol_mod),
+        "VOL_FUEL": repr(vol_fuel),
+        "VOL_SHELL": repr(vol_shell),
+        "VOL_COOL": repr(vol_cool),
+        "A_PB": repr(a_pb),
+    }
+
+
+# Geometry is identical for every scenario; format it once at import
+_GEOMETRY_VALUES = _geometry_values()
 
 
 def ramp_time_seconds(p0: float, p1: float) -> float:
@@ -71,48 +127,55 @@ def ramp_time_seconds(p0: float, p1: float) -> float:
 
 
 def generate_scenarios():
-    scenarios = []
-
-    for bucket in TEMP_BUCKETS:
-        for i in range(len(POWER_LEVELS)):
-            p_lo = POWER_LEVELS[i]
-            p_hi = POWER_LEVELS[i] + 0.1
-
-            # Ramp UP
-            if (p_lo < 1):
-                t_ramp = ramp_time_seconds(p_lo, p_hi)
-                scenarios.append(
-                    Scenario(
-                        p0=p_lo,
-                        p1=p_hi,
-                        direction="up",
-                        bucket=bucket,
-                        t_ramp_s=t_ramp,
-                        run_name=f"{int(p_lo*100)}-{int(p_hi*100)}-{bucket}-up",
-                    )
-                )
-
-            p_lo = POWER_LEVELS[i] - 0.1
-            p_hi = POWER_LEVELS[i]
-
-            # Ramp DOWN
-            if (p_lo > 0.2):
-                t_ramp = ramp_time_seconds(p_hi, p_lo)
-                scenarios.append(
-                    Scenario(
-                        p0=p_hi,
-                        p1=p_lo,
-                        direction="down",
-                        bucket=bucket,
-                        t_ramp_s=t_ramp,
-                        run_name=f"{int(p_hi*100)}-{int(p_lo*100)}-{bucket}-down",
-                    )
-                )
-
-    return scenarios
-
-
-def build_input_from_template(template_text: str, scen: Scenario) -> str:
+    # For each (bucket, level), a +0.1 "up" and a -0.1 "down" ramp, in that
+    # order; ups stop below rated power, downs must end above 20%.
+    candidates = (
+        (bucket, p0, p1, direction)
+        for bucket, p in itertools.product(TEMP_BUCKETS, POWER_LEVELS)
+        for p0, p1, direction in ((p, p + 0.1, "up"), (p, p - 0.1, "down"))
+    )
+    return [
+        Scenario(
+            p0=p0,
+            p1=p1,
+            direction=direction,
+            bucket=bucket,
+            t_ramp_s=_CONST_T_RAMP_S,
+            run_name=f"{int(p0*100)}-{int(p1*100)}-{bucket}-{direction}",
+        )
+        for bucket, p0, p1, direction in candidates
+        if (p0 < 1 if direction == "up" else p1 > 0.2)
+    ]
+
+
+@functools.lru_cache(maxsize=4)
+def _load_template(path_str: str, mtime_ns: int) -> str:
+    return Path(path_str).read_text(encoding="utf-8")
+
+
+def _get_template() -> str:
+    # Keyed on mtime so repeat main() calls only stat the unchanged template
+    p = Path(TEMPLATE_PATH)
+    return _load_template(str(p), p.stat().st_mtime_ns)
+
+
+def compile_template(template_text: str) -> tuple:
+    # Alternating (literal, key, literal, key, ..., literal)
+    segments = tuple(_PLACEHOLDER_RE.split(template_text))
+    for literal in segments[::2]:
+        if "$" in literal:
+            raise ValueError("Invalid placeholder in template: "
+                             f"{literal[literal.index('$'):][:20]!r}")
+    return segments
+
+
+def render_template(segments: tuple, values: dict) -> str:
+    return "".join(
+        seg if i % 2 == 0 else values[seg] for i, seg in enumerate(segments)
+    )
+
+
+def template_values(scen: Scenario) -> dict:
     tf = PRE_RAMP_S + scen.t_ramp_s + POST_RAMP_S
     t_ramp_start = PRE_RAMP_S
     t_ramp_end = PRE_RAMP_S + scen.t_ramp_s
@@ -129,43 +192,106 @@ def build_input_from_template(template_text: str, scen: Scenario) -> str:
 
     t_fuel0, t_mod0, t_shell0, t_cool0 = initial_temps_kelvin(scen.bucket)
 
-    tmpl = Template(template_text)
-    return tmpl.substitute(
-        TF=f"{tf:.6f}",
-        T_RAMP_START=f"{t_ramp_start:.6f}",
-        T_RAMP_END=f"{t_ramp_end:.6f}",
-        RHO_BIAS_PCM=f"{rho_bias_pcm:.6f}",
-        DELTA_RHO_PCM=f"{delta_rho_pcm:.6f}",
-        POWER_TOT=f"{power_tot:.6e}",
-        T_FUEL0=f"{t_fuel0:.6f} * units.kelvin",
-        T_MOD0=f"{t_mod0:.6f} * units.kelvin",
-        T_SHELL0=f"{t_shell0:.6f} * units.kelvin",
-        T_COOL0=f"{t_cool0:.6f} * units.kelvin",
-    )
+    # Stable per-scenario seed for the input's batched property sampling
+    seed = zlib.crc32(scen.run_name.encode("utf-8"))
+
+    return {
+        "TF": "%.6f" % tf,
+        "T_RAMP_START": "%.6f" % t_ramp_start,
+        "T_RAMP_END": "%.6f" % t_ramp_end,
+        "RHO_BIAS_PCM": "%.6f" % rho_bias_pcm,
+        "DELTA_RHO_PCM": "%.6f" % delta_rho_pcm,
+        "POWER_TOT": "%.6e" % power_tot,
+        "T_FUEL0": "%.6f * units.kelvin" % t_fuel0,
+        "T_MOD0": "%.6f * units.kelvin" % t_mod0,
+        "T_SHELL0": "%.6f * units.kelvin" % t_shell0,
+        "T_COOL0": "%.6f * units.kelvin" % t_cool0,
+        "SEED": "%d" % seed,
+        **_GEOMETRY_VALUES,
+    }
+
+
+def input_digest(template_text: str, values: dict) -> str:
+    # Covers the template and every substituted value (scenario + constants)
+    data = template_text.encode("utf-8") + repr(values).encode("utf-8")
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def input_is_current(run_dir: Path, digest: str) -> bool:
+    input_path = run_dir / "input.py"
+    if not input_path.exists():
+        return False
+    with input_path.open(encoding="utf-8") as f:
+        return f.readline() == f"# hash: {digest}\n"
+
+
+def build_input_from_template(segments: tuple, values: dict,
+                              digest: str) -> str:
+    return f"# hash: {digest}\n" + render_template(segments, values)
 
 
 def write_input_file(run_dir: Path, input_text: str):
-    run_dir.mkdir(parents=True, exist_ok=True)
-    (run_dir / "input.py").write_text(input_text, encoding="utf-8")
+    # run_dir is created up front by main()
+    input_path = run_dir / "input.py"
+    input_path.write_bytes(input_text.encode("utf-8"))
+    # Byte-compile now so the driver's import of input.py skips it
+    py_compile.compile(str(input_path), doraise=True)
+
+
+def write_input_archive(archive_path: Path, pairs):
+    mtime = time.time()
+    with tarfile.open(archive_path, "w") as tf:
+        for run_dir, input_text in pairs:
+            data = input_text.encode("utf-8")
+            info = tarfile.TarInfo(name=f"{run_dir.as_posix()}/input.py")
+            info.size = len(data)
+            info.mtime = mtime
+            tf.addfile(info, io.BytesIO(data))
 
 
 def main():
-    template_text = Path(TEMPLATE_PATH).read_text(encoding="utf-8")
+    # The template text is the same for every scenario; split it once.
+    template_text = _get_template()
+    segments = compile_template(template_text)
 
     output_root = Path(OUTPUT_ROOT)
-    output_root.mkdir(exist_ok=True)
-
     scenarios = generate_scenarios()
     print(f"Generated {len(scenarios)} scenarios.")
 
-    manifest = []
+    archive = ARCHIVE_PATH is not None
+    if not archive:
+        output_root.mkdir(exist_ok=True)
+        for scen in scenarios:
+            (output_root / scen.run_name).mkdir(parents=True, exist_ok=True)
+
+    # Render on this thread; only the file I/O is handed to the pool.
+    # Inputs whose hash header already matches are left untouched; the
+    # archive is always rewritten in full.
+    pairs = []
+    manifest = bytearray()
     for scen in scenarios:
         run_dir = output_root / scen.run_name
-        input_text = build_input_from_template(template_text, scen)
-        write_input_file(run_dir, input_text)
-        manifest.append(str(run_dir))
-
-    Path(MANIFEST_PATH).write_text("\n".join(manifest) + "\n", encoding="utf-8")
+        manifest += str(run_dir).encode("utf-8")
+        manifest += b"\n"
+
+        values = template_values(scen)
+        digest = input_digest(template_text, values)
+        if not archive and input_is_current(run_dir, digest):
+            continue
+        input_text = build_input_from_template(segments, values, digest)
+        pairs.append((run_dir, input_text))
+
+    if archive:
+        write_input_archive(Path(ARCHIVE_PATH), pairs)
+        print(f"Wrote archive: {ARCHIVE_PATH} "
+              f"(launch with PBFHR_ARCHIVE={ARCHIVE_PATH})")
+    else:
+        with ThreadPoolExecutor(max_workers=MAX_WRITERS) as ex:
+            list(ex.map(lambda p: write_input_file(*p), pairs))
+        print(f"Skipped {len(scenarios) - len(pairs)} unchanged inputs.")
+
+    # Written last so a failed run never leaves a manifest of broken inputs
+    Path(MANIFEST_PATH).write_bytes(manifest)
     print(f"Wrote manifest: {MANIFEST_PATH}")
 
 
@@ -1,5 +1,5 @@
 """
-PB-FHR PyRK input TEMPLATE (scenario-filled via string.Template)
+PB-FHR PyRK input TEMPLATE (filled per scenario by create_scenarios.py)
 
 Placeholders filled by create_scenarios.py:
 
@@ -13,16 +13,23 @@ Placeholders filled by create_scenarios.py:
   $T_MOD0
   $T_SHELL0
   $T_COOL0
+  $R_MOD
+  $R_FUEL
+  $R_SHELL
+  $VOL_MOD
+  $VOL_FUEL
+  $VOL_SHELL
+  $VOL_COOL
+  $A_PB
+  $SEED
 """
 
 from pyrk.utilities.ur import units
 from pyrk import th_component as th
-import math
 from pyrk.materials.material import Material
 from pyrk.materials.liquid_material import LiquidMaterial
 from pyrk.density_model import DensityModel
 from pyrk.convective_model import ConvectiveModel
-import random
 from pyrk.timer import Timer
 import numpy as np
 
@@ -34,11 +41,20 @@ t0 = 0.0 * units.seconds
 dt = 0.02 * units.seconds
 tf = $TF * units.seconds
 
+# Uncertain parameters, drawn in one batch from a per-scenario seed:
+# alpha_fuel, alpha_cool, k_mod, cp_mod, k_shell, cp_shell, cp_fuel,
+# cp_cool, h_cool (normal, 5% std for material properties) and k_fuel (uniform)
+_rng = np.random.default_rng($SEED)
+_means = np.array([-3.19, 0.23, 17.0, 1650.0, 17.0, 1650.0, 1818.0, 2415.78, 4700.0])
+_stds = np.array([0.1595, 0.11, 0.85, 82.5, 0.85, 82.5, 90.9, 120.789, 235.0])
+(_af, _ac, _km, _cpm, _ks, _cps, _cpf, _cpc, _hc) = _rng.normal(_means, _stds).tolist()
+_kf = float(_rng.uniform(15.0, 19.0))
+
 # Temperature feedbacks of reactivity
-alpha_fuel = random.gauss(-3.19, 0.1595) * units.pcm / units.kelvin
+alpha_fuel = _af * units.pcm / units.kelvin
 alpha_mod = -0.7 * units.pcm / units.kelvin
 alpha_shell = 0 * units.pcm / units.kelvin
-alpha_cool = random.gauss(0.23, 0.11) * units.pcm / units.kelvin
+alpha_cool = _ac * units.pcm / units.kelvin
 
 # Initial temperatures (already in kelvin)
 t_mod   = $T_MOD0
@@ -52,31 +68,19 @@ power_tot = $POWER_TOT * units.watt
 kappa = 0.0
 
 #############################################
-# Geometry helpers
-#############################################
-
-def area_sphere(r):
-    assert r >= 0 * units.meter
-    return 4.0 * math.pi * pow(r.to("meter"), 2)
-
-def vol_sphere(r):
-    assert r >= 0 * units.meter
-    return (4.0 / 3.0) * math.pi * pow(r.to("meter"), 3)
-
-#############################################
-# Pebble volumes (same as example)
+# Pebble geometry (magnitudes precomputed by create_scenarios.py)
 #############################################
 
 n_pebbles = 470000
-r_mod   = 1.25 / 100.0 * units.meter
-r_fuel  = 1.4  / 100.0 * units.meter
-r_shell = 1.5  / 100.0 * units.meter
+r_mod   = $R_MOD * units.meter
+r_fuel  = $R_FUEL * units.meter
+r_shell = $R_SHELL * units.meter
 
-vol_mod   = vol_sphere(r_mod)
-vol_fuel  = vol_sphere(r_fuel)  - vol_sphere(r_mod)
-vol_shell = vol_sphere(r_shell) - vol_sphere(r_fuel)
-vol_cool  = (vol_mod + vol_fuel + vol_shell) * 0.4 / 0.6
-a_pb = area_sphere(r_shell)
+vol_mod   = $VOL_MOD * units.meter**3
+vol_fuel  = $VOL_FUEL * units.meter**3
+vol_shell = $VOL_SHELL * units.meter**3
+vol_cool  = $VOL_COOL * units.meter**3
+a_pb = $A_PB * units.meter**2
 
 #############################################
 # Required input
@@ -117,23 +121,23 @@ nsteps = 5000
 # Materials (same distributions as example)
 #############################################
 
-k_mod = random.gauss(17, 17 * 0.05) * units.watt / (units.meter * units.kelvin)
-cp_mod = random.gauss(1650.0, 1650.0 * 0.05) * units.joule / (units.kg * units.kelvin)
+k_mod = _km * units.watt / (units.meter * units.kelvin)
+cp_mod = _cpm * units.joule / (units.kg * units.kelvin)
 rho_mod = DensityModel(a=1740.0 * units.kg / (units.meter**3), model="constant")
 Moderator = Material("mod", k_mod, cp_mod, dm=rho_mod)
 
-k_fuel = random.uniform(15.0, 19.0) * units.watt / (units.meter * units.kelvin)
-cp_fuel = random.gauss(1818.0, 1818.0 * 0.05) * units.joule / (units.kg * units.kelvin)
+k_fuel = _kf * units.watt / (units.meter * units.kelvin)
+cp_fuel = _cpf * units.joule / (units.kg * units.kelvin)
 rho_fuel = DensityModel(a=2220.0 * units.kg / (units.meter**3), model="constant")
 Fuel = Material("fuel", k_fuel, cp_fuel, dm=rho_fuel)
 
-k_shell = random.gauss(17, 17 * 0.05) * units.watt / (units.meter * units.kelvin)
-cp_shell = random.gauss(1650.0, 1650.0 * 0.05) * units.joule / (units.kg * units.kelvin)
+k_shell = _ks * units.watt / (units.meter * units.kelvin)
+cp_shell = _cps * units.joule / (units.kg * units.kelvin)
 rho_shell = DensityModel(a=1740.0 * units.kg / (units.meter**3), model="constant")
 Shell = Material("shell", k_shell, cp_shell, dm=rho_shell)
 
 k_cool = 1.0 * units.watt / (units.meter * units.kelvin)
-cp_cool = random.gauss(2415.78, 2415.78 * 0.05) * units.joule / (units.kg * units.kelvin)
+cp_cool = _cpc * units.joule / (units.kg * units.kelvin)
 rho_cool = DensityModel(
     a=2415.6 * units.kg / (units.meter**3),
     b=0.49072 * units.kg / (units.meter**3) / units.kelvin,
@@ -143,7 +147,7 @@ mu0 = 0 * units.pascal * units.second
 cool_mat = LiquidMaterial("cool", k_cool, cp_cool, rho_cool, mu0)
 
 # Coolant flow properties
-h_cool_rd = random.gauss(4700.0, 4700.0 * 0.05) * units.watt / units.kelvin / units.meter**2
+h_cool_rd = _hc * units.watt / units.kelvin / units.meter**2
 h_cool = ConvectiveModel(h0=h_cool_rd, mat=cool_mat, model="constant")
 m_flow = 976.0 * units.kg / units.second
 t_inlet = units.Quantity(600.0, units.degC)
@@ -0,0 +1,64 @@
+import importlib.util
+import tarfile
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+TEMPLATE = REPO_ROOT / "examples" / "pbfhr" / "input_template.py"
+
+_spec = importlib.util.spec_from_file_location(
+    "create_scenarios", REPO_ROOT / "create_scenarios.py")
+cs = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(cs)
+
+
+@pytest.fixture
+def scratch(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cs, "TEMPLATE_PATH", str(TEMPLATE))
+    monkeypatch.setattr(cs, "ARCHIVE_PATH", None)
+    return tmp_path
+
+
+def test_inputs_start_with_hash_header(scratch):
+    cs.main()
+    for line in Path(cs.MANIFEST_PATH).read_text().splitlines():
+        first = (Path(line) / "input.py").read_text().splitlines()[0]
+        assert first.startswith("# hash: ")
+
+
+def test_rerun_skips_unchanged_inputs(scratch, capsys):
+    cs.main()
+    n = len(cs.generate_scenarios())
+    capsys.readouterr()
+    cs.main()
+    assert f"Skipped {n} unchanged inputs." in capsys.readouterr().out
+
+
+def test_rerun_rewrites_stale_input(scratch, capsys):
+    cs.main()
+    n = len(cs.generate_scenarios())
+    stale = Path(cs.OUTPUT_ROOT) / cs.generate_scenarios()[0].run_name
+    stale = stale / "input.py"
+    fresh = stale.read_text()
+    stale.write_text("# hash: 0\n")
+    capsys.readouterr()
+    cs.main()
+    assert f"Skipped {n - 1} unchanged inputs." in capsys.readouterr().out
+    assert stale.read_text() == fresh
+
+
+def test_archive_round_trip(scratch, monkeypatch):
+    monkeypatch.setattr(cs, "ARCHIVE_PATH", "inputs.tar")
+    cs.main()
+    assert not Path(cs.OUTPUT_ROOT).exists()
+    run_dirs = Path(cs.MANIFEST_PATH).read_text().splitlines()
+    with tarfile.open("inputs.tar") as tf:
+        assert tf.getnames() == [f"{d}/input.py" for d in run_dirs]
+        archived = {m.name: tf.extractfile(m).read() for m in tf}
+
+    monkeypatch.setattr(cs, "ARCHIVE_PATH", None)
+    cs.main()
+    for name, data in archived.items():
+        assert Path(name).read_bytes() == data
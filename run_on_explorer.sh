@@ -9,6 +9,10 @@ conda activate pranpyrk
 export PYTHONPATH="/home/wuppuluru.p/pyrk:${PYTHONPATH:-}"
 
 MANIFEST="/home/wuppuluru.p/pyrk/pbfhr_manifest.txt"
+# Set PBFHR_ARCHIVE to the tar written by create_scenarios.py (ARCHIVE_PATH)
+# to run from it; each run's input.py is then always re-extracted, replacing
+# any input.py already in the run directory.
+ARCHIVE="${PBFHR_ARCHIVE:-}"
 OUTCSV_NAME="power.csv"
 OUTLOG_DIR="/home/wuppuluru.p/pyrk/pbfhr_logs"
 mkdir -p "$OUTLOG_DIR"
@@ -30,6 +34,10 @@ for ((i=proc; i<N; i+=ntasks)); do
 
 	echo "Starting $run_name"
 
+	if [[ -n "$ARCHIVE" ]]; then
+		tar -xf "$ARCHIVE" "$run_dir/input.py"
+	fi
+
 	(
 	cd "$run_dir"
 	python -m pyrk.driver \